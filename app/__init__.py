@@ -1,17 +1,23 @@
 # app/__init__.py
 
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import Flask, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
 from flask_login import LoginManager, current_user
 from authlib.integrations.flask_client import OAuth
 from sqlalchemy import text
 
 from .config import Config
+from .visit_buffer import VisitBuffer
 
 # Global extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 oauth = OAuth()
+cache = Cache()
+visit_buffer = VisitBuffer()
 
 
 def create_app():
@@ -24,6 +30,15 @@ def create_app():
     db.init_app(app)
     login_manager.init_app(app)
     oauth.init_app(app)
+    cache.init_app(app)
+    visit_buffer.init_app(app)
+
+    # OpenAI calls are I/O-bound; run generation jobs on threads so the
+    # dashboard POST returns right away (see app/jobs.py).
+    app.extensions["generation_pool"] = ThreadPoolExecutor(
+        max_workers=app.config["GENERATION_WORKERS"],
+        thread_name_prefix="flashcards",
+    )
 
     # Import models so SQLAlchemy is aware of them
     from .models import User, Subscription, Flashcard, Visit, Review  # noqa
@@ -83,8 +98,27 @@ def create_app():
             "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_output_tokens BIGINT DEFAULT 0",
             "ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_input_tokens BIGINT DEFAULT 0",
             "ALTER TABLE users ADD COLUMN IF NOT EXISTS monthly_output_tokens BIGINT DEFAULT 0",
+
+            # Per-user, time-ranged flashcard lookups
+            "CREATE INDEX IF NOT EXISTS ix_flashcards_user_id_created_at ON flashcards (user_id, created_at)",
+
+            # Admin aggregates cache key (MAX(updated_at))
+            "CREATE INDEX IF NOT EXISTS ix_users_updated_at ON users (updated_at)",
         ]
 
+        # created_at indexes on the append-only event tables, declared in
+        # the models (BRIN on Postgres, a plain B-tree elsewhere). Databases
+        # created before that have ix_<table>_created_at B-trees instead.
+        event_tables = ("visits", "subscriptions", "flashcards")
+        if db.engine.dialect.name == "postgresql":
+            _ensure_brin_indexes(app, event_tables)
+        else:
+            for table in event_tables:
+                alter_statements += [
+                    f"CREATE INDEX IF NOT EXISTS ix_{table}_created_at_brin ON {table} (created_at)",
+                    f"DROP INDEX IF EXISTS ix_{table}_created_at",
+                ]
+
         for sql in alter_statements:
             try:
                 db.session.execute(text(sql))
@@ -92,32 +126,86 @@ def create_app():
             except Exception:
                 db.session.rollback()
 
+        # The admin charts read the daily_metrics rollup. On the first start
+        # with an empty rollup (new table on an existing database), fill it
+        # from the event history; after that, writes keep it current.
+        # `flask --app manage backfill_metrics` rebuilds it by hand.
+        from .models import DailyMetric
+        from .metrics import backfill_daily_metrics
+
+        try:
+            if not db.session.query(DailyMetric.query.exists()).scalar():
+                backfill_daily_metrics()
+        except Exception:
+            db.session.rollback()
+            app.logger.exception("Initial daily_metrics backfill failed")
+
     # ------------------------
     # Automatic visit tracking
     # ------------------------
-    @app.before_request
-    def track_visit():
+    @app.after_request
+    def track_visit(response):
         try:
             path = request.path or ""
 
-            # Skip static assets + favicon
-            if path.startswith("/static") or path.startswith("/favicon"):
-                return
-
-            from .models import Visit
+            # Skip static assets + favicon, and the dashboard's job polling
+            # (one request every 2s per running job, not a page view)
+            if path.startswith(("/static", "/favicon", "/job_status/")):
+                return response
 
-            user_id = current_user.id if current_user.is_authenticated else None
+            row = {
+                "user_id": current_user.id if current_user.is_authenticated else None,
+                "path": path,
+                "ip_address": request.headers.get("X-Forwarded-For", request.remote_addr),
+                "user_agent": request.headers.get("User-Agent"),
+            }
 
-            v = Visit(
-                user_id=user_id,
-                path=path,
-                ip_address=request.headers.get("X-Forwarded-For", request.remote_addr),
-                user_agent=request.headers.get("User-Agent"),
-            )
-            db.session.add(v)
-            db.session.commit()
+            # Queued once the response has been sent; written in batches
+            # by the VisitBuffer thread
+            response.call_on_close(lambda: visit_buffer.add(**row))
 
         except Exception:
-            db.session.rollback()
+            app.logger.exception("Error queueing visit")
+
+        return response
 
     return app
+
+
+def _ensure_brin_indexes(app, tables) -> None:
+    """
+    Build the BRIN created_at indexes on an existing Postgres database and
+    drop the B-trees they replace.
+
+    CONCURRENTLY, so a large table (visits) stays writable while the index
+    builds. That can't run inside a transaction, hence the AUTOCOMMIT
+    connection. A build that was interrupted leaves an INVALID index that
+    IF NOT EXISTS would keep forever, so such leftovers are dropped first.
+    """
+    with db.engine.connect().execution_options(
+        isolation_level="AUTOCOMMIT"
+    ) as conn:
+        for table in tables:
+            brin = f"ix_{table}_created_at_brin"
+            try:
+                invalid = conn.execute(
+                    text(
+                        "SELECT 1 FROM pg_index i "
+                        "JOIN pg_class c ON c.oid = i.indexrelid "
+                        "WHERE c.relname = :name AND NOT i.indisvalid"
+                    ),
+                    {"name": brin},
+                ).first()
+                if invalid:
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {brin}"))
+                conn.execute(
+                    text(
+                        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {brin} "
+                        f"ON {table} USING BRIN (created_at)"
+                    )
+                )
+                conn.execute(
+                    text(f"DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_created_at")
+                )
+            except Exception:
+                app.logger.exception("Error creating BRIN index on %s", table)
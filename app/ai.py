@@ -195,12 +195,17 @@ def _normalize_cards(raw: str) -> List[Dict[str, str]]:
     return cards
 
 
-def _record_token_usage(response) -> None:
+def _record_token_usage(response, user=None) -> None:
     """
-    Update current_user's token counters from an OpenAI response, if available.
-    Safe to call even if there's no logged-in user or no usage info.
+    Update the user's token counters from an OpenAI response, if available.
+
+    `user` defaults to current_user; background jobs (no request context)
+    pass the User explicitly. Safe to call even if there's no logged-in user
+    or no usage info.
     """
-    if not getattr(current_user, "is_authenticated", False):
+    if user is None:
+        user = current_user
+    if not getattr(user, "is_authenticated", False):
         return
 
     usage = getattr(response, "usage", None)
@@ -228,10 +233,10 @@ def _record_token_usage(response) -> None:
         out_tokens = 0
 
     # Update user fields
-    current_user.daily_input_tokens = (current_user.daily_input_tokens or 0) + in_tokens
-    current_user.daily_output_tokens = (current_user.daily_output_tokens or 0) + out_tokens
-    current_user.monthly_input_tokens = (current_user.monthly_input_tokens or 0) + in_tokens
-    current_user.monthly_output_tokens = (current_user.monthly_output_tokens or 0) + out_tokens
+    user.daily_input_tokens = (user.daily_input_tokens or 0) + in_tokens
+    user.daily_output_tokens = (user.daily_output_tokens or 0) + out_tokens
+    user.monthly_input_tokens = (user.monthly_input_tokens or 0) + in_tokens
+    user.monthly_output_tokens = (user.monthly_output_tokens or 0) + out_tokens
 
     try:
         db.session.commit()
@@ -244,6 +249,7 @@ def _call_openai_for_segment(
     segment_index: int,
     total_segments: int,
     target_cards: int,
+    user=None,
 ) -> List[Dict[str, str]]:
     """
     Call OpenAI for a single segment of the text.
@@ -300,8 +306,8 @@ Here is the segment text:
         temperature=0.3,
     )
 
-    # Track token usage on the current user, if possible
-    _record_token_usage(response)
+    # Track token usage on the user (default: current_user), if possible
+    _record_token_usage(response, user)
 
     content = response.choices[0].message.content or ""
     return _normalize_cards(content)
@@ -310,10 +316,13 @@ Here is the segment text:
 def generate_flashcards_from_text(
     source_text: str,
     num_cards: int = 10,
+    user=None,
 ) -> List[Dict[str, str]]:
     """
     Main API for the rest of the app.
 
+    Token usage is charged to `user` (default: current_user).
+
     - Preprocesses & segments the input text.
     - Calls OpenAI once per segment, telling it:
         * "Use all the important info in this segment."
@@ -366,6 +375,7 @@ def generate_flashcards_from_text(
             segment_index=idx,
             total_segments=len(segments),
             target_cards=segment_target,
+            user=user,
         )
 
         all_cards.extend(segment_cards)
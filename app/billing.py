@@ -14,6 +14,7 @@ from flask_login import login_required, current_user
 
 from . import db
 from .models import User, Subscription
+from .metrics import record_metric
 from .config import Config
 
 billing_bp = Blueprint("billing", __name__, url_prefix="/billing")
@@ -92,6 +93,7 @@ def _apply_plan_change(user: User, price_id: str | None, subscription_id: str |
     )
     try:
         db.session.add(sub)
+        record_metric("subs")
         db.session.commit()
     except Exception:
         db.session.rollback()
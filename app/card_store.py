@@ -0,0 +1,41 @@
+# app/card_store.py
+
+from typing import Any, Dict, List
+
+from flask import current_app, session
+from flask_login import current_user
+
+from . import cache
+
+# How long a generated deck stays downloadable (seconds)
+CARDS_TTL = 24 * 60 * 60
+
+
+def _cards_key() -> str:
+    return f"cards:{current_user.id}"
+
+
+def store_cards(cards: List[Dict[str, Any]]) -> None:
+    """
+    Keep the logged-in user's latest generated cards in the app cache
+    (Flask-Caching), keyed by user id, so nothing deck-related goes into
+    the session cookie. Only as durable as the cache backend: Redis when
+    REDIS_URL is set, otherwise per-process memory (see Config).
+    """
+    try:
+        cache.set(_cards_key(), cards, timeout=CARDS_TTL)
+    except Exception:
+        # Cache backend down: the deck just isn't kept for export
+        current_app.logger.exception("Error storing generated cards")
+    # Drop references / copies left in older cookies, if any
+    session.pop("cards_key", None)
+    session.pop("cards", None)
+
+
+def load_cards() -> List[Dict[str, Any]]:
+    """Return the logged-in user's latest cards (or [], also on cache errors)."""
+    try:
+        return cache.get(_cards_key()) or []
+    except Exception:
+        current_app.logger.exception("Error loading generated cards")
+        return []
@@ -19,6 +19,9 @@ class Config:
     SQLALCHEMY_DATABASE_URI = _db_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Reject uploads (e.g. PDFs) larger than this before they're buffered
+    MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50 MB
+
     # ------------------------------------------------------------------
     # Google OAuth
     # ------------------------------------------------------------------
@@ -49,7 +52,7 @@ class Config:
     # ------------------------------------------------------------------
     # Celery / Redis (for background flashcard jobs)
     # ------------------------------------------------------------------
-    # On Render, set REDIS_URL in the Dashboard (from your Redis add-on).
+    # On Render, REDIS_URL comes from the Redis service in render.yaml.
     # Locally it defaults to a local Redis.
     REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 
@@ -62,6 +65,40 @@ class Config:
         os.environ.get("CELERY_TASK_SOFT_TIME_LIMIT", "840")
     )  # 14 min
 
+    # ------------------------------------------------------------------
+    # Flask-Caching
+    # ------------------------------------------------------------------
+    # Use Redis when REDIS_URL is explicitly configured (render.yaml wires
+    # it from the cardifylabs-redis service), otherwise an in-process cache
+    # for local dev. SimpleCache is per-process and lost on restart, so
+    # stored decks and running/finished job states disappear on deploy, and
+    # once CACHE_THRESHOLD entries are reached it evicts older ones early.
+    CACHE_TYPE = "RedisCache" if os.environ.get("REDIS_URL") else "SimpleCache"
+    CACHE_REDIS_URL = REDIS_URL
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_THRESHOLD = int(os.environ.get("CACHE_THRESHOLD", "5000"))
+
+    # ------------------------------------------------------------------
+    # Background flashcard generation (app/jobs.py)
+    # ------------------------------------------------------------------
+    # Threads that run OpenAI calls off the request worker
+    GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", "4"))
+    # A job still queued/started this long after it was queued (seconds)
+    # is failed by /job_status and its reserved cards are released, e.g.
+    # one lost to a worker restart or deploy
+    GENERATION_JOB_TIMEOUT = int(os.environ.get("GENERATION_JOB_TIMEOUT", "900"))
+
+    # ------------------------------------------------------------------
+    # Visit tracking
+    # ------------------------------------------------------------------
+    # Page views are buffered in memory and bulk-inserted this often (seconds)
+    VISIT_FLUSH_INTERVAL = float(os.environ.get("VISIT_FLUSH_INTERVAL", "2"))
+
+    # ------------------------------------------------------------------
+    # PDF extraction (each upload is parsed in its own killable process)
+    # ------------------------------------------------------------------
+    PDF_EXTRACT_TIMEOUT = int(os.environ.get("PDF_EXTRACT_TIMEOUT", "30"))  # seconds
+
 
 # ----------------------------------------------------------------------
 # System prompt for OpenAI (imported as SYSTEM_PROMPT in app/ai.py)
@@ -108,13 +108,14 @@ def create_apkg_from_cards(cards: List[Any], deck_name: str = "CardifyAI Deck")
 def create_csv_from_cards(cards: List[Any]) -> io.BytesIO:
     cards = _normalize_cards(cards)
 
-    s = io.StringIO()
+    # Encode straight into the BytesIO (no intermediate str + bytes copy)
+    b = io.BytesIO()
+    s = io.TextIOWrapper(b, encoding="utf-8", newline="")
     writer = csv.writer(s)
     writer.writerow(["front", "back"])
-    for c in cards:
-        writer.writerow([c["front"], c["back"]])
+    writer.writerows([c["front"], c["back"]] for c in cards)
+    s.detach()  # flush + release b without closing it
 
-    b = io.BytesIO(s.getvalue().encode("utf-8"))
     b.seek(0)
     return b
 
@@ -132,9 +133,12 @@ def create_json_from_cards(cards: List[Any]) -> io.BytesIO:
     ]
     """
     cards = _normalize_cards(cards)
-    payload = json.dumps(cards, ensure_ascii=False, indent=2).encode("utf-8")
 
-    b = io.BytesIO(payload)
+    b = io.BytesIO()
+    s = io.TextIOWrapper(b, encoding="utf-8", newline="")  # "\n" on every OS
+    json.dump(cards, s, ensure_ascii=False, indent=2)
+    s.detach()  # flush + release b without closing it
+
     b.seek(0)
     return b
 
@@ -6,6 +6,8 @@ from flask_login import current_user
 from . import db
 from .models import Flashcard
 from .ai import generate_flashcards_from_text
+from .card_store import store_cards
+from .metrics import bump_card_counters, record_metric
 
 # We do NOT set url_prefix here, it's added in app/__init__.py
 extension_api = Blueprint("extension_api", __name__)
@@ -25,7 +27,7 @@ def extension_generate():
     - Accept JSON: { "text": str, "num_cards": int }
     - Generate flashcards via OpenAI
     - Save them to the Flashcard table
-    - Store them in session["cards"] so /dashboard can display/export
+    - Store them via card_store so /dashboard can display/export
     - ALSO store original text + num_cards in session so the dashboard form can pre-fill
     - Mark that cards came from the extension (from_extension/cards_created)
     - Return a redirect URL for the extension to open
@@ -119,6 +121,7 @@ def extension_generate():
     # SAVE FLASHCARDS TO DB
     # ---------------------------
     try:
+        saved = 0
         for c in cards:
             # c is expected to be a dict with "front"/"back"
             front = str(c.get("front", "")).strip()
@@ -133,15 +136,12 @@ def extension_generate():
                 source_type="extension",  # distinct from "dashboard"
             )
             db.session.add(fc)
+            saved += 1
 
-        # Update usage counters (analytics only)
-        if current_user.daily_cards_generated is None:
-            current_user.daily_cards_generated = 0
-        if current_user.cards_generated_this_month is None:
-            current_user.cards_generated_this_month = 0
+        record_metric("cards", saved)
 
-        current_user.daily_cards_generated += used
-        current_user.cards_generated_this_month += used
+        # Usage counters (analytics only)
+        bump_card_counters(current_user.id, used)
 
         db.session.commit()
     except Exception:
@@ -153,7 +153,7 @@ def extension_generate():
     # ---------------------------
     try:
         # So /dashboard can immediately show/export them
-        session["cards"] = cards
+        store_cards(cards)
 
         # So /dashboard can pre-fill the form with the original input
         session["ext_text"] = text
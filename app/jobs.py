@@ -0,0 +1,216 @@
+# app/jobs.py
+
+import time
+import uuid
+
+from flask import current_app
+from sqlalchemy import case, func, update
+
+from . import db, cache
+from .models import User, Flashcard
+from .ai import generate_flashcards_from_text
+from .metrics import bump_card_counters, record_metric
+
+# How long a job's status/result stays readable (seconds)
+JOB_TTL = 3600
+
+
+def _job_key(job_id: str) -> str:
+    return f"job:{job_id}"
+
+
+def _set_job(job_id: str, **state) -> None:
+    cache.set(_job_key(job_id), state, timeout=JOB_TTL)
+
+
+def get_job(job_id: str) -> dict | None:
+    """Return the job's state dict, or None if unknown / expired."""
+    return cache.get(_job_key(job_id))
+
+
+def _update_job(job_id: str, **changes) -> None:
+    """Merge `changes` into the job's stored state."""
+    _set_job(job_id, **{**(get_job(job_id) or {}), **changes})
+
+
+def _settle(job_id: str) -> bool:
+    """
+    Claim the right to settle a job (release its unused reservation and
+    write its final status). Only one of the worker and expire_if_overdue
+    wins, so a job's cards are never given back twice.
+    """
+    try:
+        return bool(cache.add(f"{_job_key(job_id)}:settled", True, timeout=JOB_TTL))
+    except Exception:
+        # Cache down: job_status can't read (or expire) the job either
+        return True
+
+
+def mark_delivered(job_id: str, job: dict) -> bool:
+    """
+    Flag a finished/failed job's result as handed to the user.
+    Returns False if it already was (so the result is shown only once).
+    """
+    if job.get("delivered"):
+        return False
+    _set_job(job_id, **{**job, "delivered": True})
+    return True
+
+
+def expire_if_overdue(job_id: str, job: dict) -> dict:
+    """
+    Fail a job still queued/started GENERATION_JOB_TIMEOUT seconds after
+    it was queued (its worker died in a restart/deploy, or it is stuck)
+    and release its reservation. Returns the job's (possibly new) state.
+    """
+    if job["status"] not in ("queued", "started"):
+        return job
+    deadline = job.get("started_at", 0) + current_app.config["GENERATION_JOB_TIMEOUT"]
+    if time.time() < deadline or not _settle(job_id):
+        return job
+
+    if job.get("num_cards"):
+        _release_daily_cards(job["user_id"], job["num_cards"])
+    job = {**job, "status": "failed", "error": "the job timed out"}
+    _set_job(job_id, **job)
+    return job
+
+
+def reserve_daily_cards(user_id: int, n: int, daily_limit: int) -> bool:
+    """
+    Atomically add n cards to the user's daily usage, but only if that
+    stays within `daily_limit`. Commits; returns False if it wouldn't fit.
+
+    Done when the job is queued (not when it finishes), so several quick
+    POSTs can't all pass the limit check before any job has counted.
+    The part a job doesn't use is given back by _release_daily_cards.
+    """
+    used = func.coalesce(User.daily_cards_generated, 0)
+    result = db.session.execute(
+        update(User)
+        .where(User.id == user_id, used + n <= daily_limit)
+        .values(daily_cards_generated=used + n)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _release_daily_cards(user_id: int, n: int) -> None:
+    """Give back n reserved-but-unused cards (never below 0)."""
+    used = func.coalesce(User.daily_cards_generated, 0)
+    try:
+        db.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(daily_cards_generated=case((used > n, used - n), else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Error releasing reserved daily cards")
+
+
+def enqueue_generation(user_id: int, text: str, num_cards: int) -> str:
+    """
+    Run flashcard generation for `user_id` on the app's generation pool.
+
+    The caller must already hold a reservation for `num_cards` (see
+    reserve_daily_cards); the job releases whatever it doesn't produce,
+    and all of it is released if the job can't be queued (then re-raises).
+
+    Returns a job id immediately; the dashboard polls /job_status/<id>.
+    State lives in the app cache: queued -> started -> finished | failed
+    (also failed by expire_if_overdue when the worker never reports back).
+    """
+    app = current_app._get_current_object()
+    job_id = uuid.uuid4().hex
+    try:
+        _set_job(
+            job_id,
+            status="queued",
+            user_id=user_id,
+            num_cards=num_cards,
+            started_at=time.time(),
+        )
+        app.extensions["generation_pool"].submit(
+            _generate_job, app, job_id, user_id, text, num_cards
+        )
+    except Exception:
+        # Cache down / pool shut down: the job will never run, so the
+        # reservation must not stay used up
+        _release_daily_cards(user_id, num_cards)
+        raise
+    return job_id
+
+
+def _generate_job(app, job_id: str, user_id: int, text: str, num_cards: int) -> None:
+    """
+    Worker body: call the AI, then persist the cards (see _save_cards).
+
+    Runs in a pool thread, so there is no request (and no current_user);
+    the User is loaded here and passed to the AI layer for token tracking.
+    """
+    with app.app_context():
+        try:
+            _update_job(job_id, status="started")
+            user = db.session.get(User, user_id)
+            cards = generate_flashcards_from_text(
+                text, num_cards=num_cards, user=user
+            )
+
+            if cards:
+                _save_cards(user_id, cards)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception("Flashcard generation job %s failed", job_id)
+            if _settle(job_id):
+                _release_daily_cards(user_id, num_cards)
+                _update_job(job_id, status="failed", error=str(e))
+            return
+
+        if not _settle(job_id):
+            # Already failed by expire_if_overdue, reservation released
+            app.logger.warning("Job %s finished after its deadline", job_id)
+            return
+
+        # Released before "finished" so the dashboard reload shows it
+        unused = num_cards - len(cards or [])
+        if unused > 0:
+            _release_daily_cards(user_id, unused)
+        _update_job(job_id, status="finished", cards=cards)
+
+
+def _save_cards(user_id: int, cards: list) -> None:
+    """
+    Persist generated cards (Flashcard table) + usage counters in ONE commit.
+    The daily counter was already reserved at enqueue time, so only the
+    monthly one is bumped here.
+
+    A DB failure here is logged but doesn't fail the job: the user still
+    gets the cards they paid tokens for.
+    """
+    used = len(cards)
+    try:
+        # generate_flashcards_from_text already returns normalized
+        # {"front", "back"} dicts with non-empty values.
+        db.session.bulk_insert_mappings(
+            Flashcard,
+            [
+                {
+                    "user_id": user_id,
+                    "front": c["front"],
+                    "back": c["back"],
+                    "source_type": "dashboard",
+                }
+                for c in cards
+            ],
+        )
+        record_metric("cards", used)
+
+        bump_card_counters(user_id, used, daily=False)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception("Error saving flashcards to DB")
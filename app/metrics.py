@@ -0,0 +1,120 @@
+# app/metrics.py
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, update
+
+from . import db
+from .models import DailyMetric, User, Visit, Subscription, Flashcard
+
+# DailyMetric.kind -> created_at column of the event table it counts
+METRIC_SOURCES = {
+    "visits": Visit.created_at,
+    "subs": Subscription.created_at,
+    "cards": Flashcard.created_at,
+}
+
+
+def _upsert(counts: dict, increment: bool = True) -> None:
+    """
+    Upsert {(day, kind): n} into daily_metrics.
+
+    With increment=True, n is added to the existing count; otherwise the
+    count is replaced (used by backfill). Does NOT commit: callers run
+    this inside the transaction that writes the events themselves.
+    """
+    if not counts:
+        return
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        # No portable ON CONFLICT: UPDATE, then INSERT the rows that
+        # didn't exist yet (not race-free, fine for dev databases).
+        for (day, kind), n in counts.items():
+            value = DailyMetric.count + n if increment else n
+            updated = DailyMetric.query.filter_by(day=day, kind=kind).update(
+                {"count": value}, synchronize_session=False
+            )
+            if not updated:
+                db.session.add(DailyMetric(day=day, kind=kind, count=n))
+        return
+
+    # One INSERT ... ON CONFLICT (day, kind) DO UPDATE for all rows
+    stmt = insert(DailyMetric).values(
+        [{"day": day, "kind": kind, "count": n} for (day, kind), n in counts.items()]
+    )
+    new_count = stmt.excluded.count
+    if increment:
+        new_count = DailyMetric.count + new_count
+    db.session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["day", "kind"], set_={"count": new_count}
+        )
+    )
+
+
+def record_metric(kind: str, n: int = 1, when: datetime | None = None) -> None:
+    """Add n events of `kind` to the day of `when` (default: now, UTC)."""
+    if n:
+        day = (when or datetime.utcnow()).date()
+        _upsert({(day, kind): n})
+
+
+def record_metric_times(kind: str, timestamps) -> None:
+    """Add one event of `kind` per timestamp, grouped by day."""
+    _upsert(Counter((ts.date(), kind) for ts in timestamps))
+
+
+def bump_card_counters(user_id: int, n: int, daily: bool = True) -> None:
+    """
+    Add n generated cards to the user's monthly counter and, unless
+    daily=False (dashboard jobs reserve their daily quota up front, see
+    jobs.reserve_daily_cards), to the daily one.
+
+    One atomic UPDATE, so concurrent generations can't lose increments.
+    Does NOT commit (same as record_metric).
+    """
+    values = {
+        "cards_generated_this_month": func.coalesce(
+            User.cards_generated_this_month, 0
+        )
+        + n,
+    }
+    if daily:
+        values["daily_cards_generated"] = (
+            func.coalesce(User.daily_cards_generated, 0) + n
+        )
+    db.session.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def backfill_daily_metrics(since: datetime | None = None) -> int:
+    """
+    Recompute daily_metrics from the raw event tables (optionally only
+    days on/after `since`). Existing counts for those days are replaced.
+    Commits; returns the number of (day, kind) rows written.
+    """
+    counts = {}
+    for kind, created_at in METRIC_SOURCES.items():
+        day = func.date(created_at).label("d")
+        q = db.session.query(day, func.count().label("n"))
+        if since is not None:
+            q = q.filter(created_at >= since)
+        for d, n in q.group_by(day).all():
+            # DATE() comes back as a date on Postgres, a string on SQLite
+            if isinstance(d, str):
+                d = datetime.strptime(d, "%Y-%m-%d").date()
+            counts[(d, kind)] = n
+
+    _upsert(counts, increment=False)
+    db.session.commit()
+    return len(counts)
@@ -5,6 +5,9 @@ from flask_login import UserMixin
 
 from . import db
 
+# Any paid plan counts as "premium" (see User.is_premium)
+_PAID_PLANS = frozenset(("basic", "premium", "professional"))
+
 
 class User(db.Model, UserMixin):
     __tablename__ = "users"
@@ -56,8 +59,9 @@ class User(db.Model, UserMixin):
     # Timestamps
     # =========================
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Indexed: MAX(updated_at) keys the admin aggregates cache
     updated_at = db.Column(
-        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True
     )
 
     # =========================
@@ -74,7 +78,7 @@ class User(db.Model, UserMixin):
     @property
     def is_premium(self) -> bool:
         """Treat any paid plan as premium."""
-        return self.plan in {"basic", "premium", "professional"}
+        return self.plan in _PAID_PLANS
 
     @property
     def daily_total_tokens(self) -> int:
@@ -94,6 +98,14 @@ class Subscription(db.Model):
     """
 
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        # Append-only by created_at: BRIN on Postgres (a few-KB index that
+        # still narrows time-range scans); other databases ignore
+        # postgresql_using and build a plain B-tree
+        db.Index(
+            "ix_subscriptions_created_at_brin", "created_at", postgresql_using="brin"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -125,6 +137,14 @@ class Subscription(db.Model):
 
 class Flashcard(db.Model):
     __tablename__ = "flashcards"
+    __table_args__ = (
+        # Per-user, time-ranged lookups (e.g. a user's cards in a window)
+        db.Index("ix_flashcards_user_id_created_at", "user_id", "created_at"),
+        # Time-range scans over all cards; BRIN on Postgres (see Subscription)
+        db.Index(
+            "ix_flashcards_created_at_brin", "created_at", postgresql_using="brin"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -158,6 +178,10 @@ class Visit(db.Model):
     """
 
     __tablename__ = "visits"
+    __table_args__ = (
+        # BRIN on Postgres (see Subscription)
+        db.Index("ix_visits_created_at_brin", "created_at", postgresql_using="brin"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -172,12 +196,37 @@ class Visit(db.Model):
     ip_address = db.Column(db.String(64))
     user_agent = db.Column(db.String(512))
 
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self) -> str:
         return f"<Visit id={self.id} path={self.path} user_id={self.user_id}>"
 
 
+class DailyMetric(db.Model):
+    """
+    Per-day event counters backing the admin analytics charts.
+
+    One row per (day, kind), where kind is "visits", "subs" or "cards".
+    Incremented in the same transaction that inserts the events (see
+    app/metrics.py), so charts read ~90 tiny rows instead of scanning the
+    raw visits / subscriptions / flashcards tables.
+    """
+
+    __tablename__ = "daily_metrics"
+    __table_args__ = (
+        db.UniqueConstraint("day", "kind", name="uq_daily_metrics_day_kind"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    day = db.Column(db.Date, nullable=False)
+    kind = db.Column(db.String(32), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<DailyMetric day={self.day} kind={self.kind} count={self.count}>"
+
+
 class Review(db.Model):
     """
     User reviews for CardifyAI.
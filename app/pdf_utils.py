@@ -1,19 +1,71 @@
 # app/pdf_utils.py
 
-from io import BytesIO
-from typing import Optional
+import os
+import subprocess
+import sys
+import tempfile
+from typing import BinaryIO, Union
 
 import fitz  # PyMuPDF
 
 
-def extract_text_from_pdf(pdf_bytes: BytesIO) -> str:
+def extract_text_from_pdf(pdf: Union[str, os.PathLike, BinaryIO]) -> str:
     """
-    Extract text from a PDF file (given as bytes) using PyMuPDF.
+    Extract text from a PDF using PyMuPDF.
+
+    `pdf` may be a filesystem path (preferred: PyMuPDF reads it straight
+    from disk) or a binary file-like object such as BytesIO.
+    """
+    if isinstance(pdf, (str, os.PathLike)):
+        doc = fitz.open(pdf, filetype="pdf")
+    else:
+        pdf.seek(0)
+        doc = fitz.open(stream=pdf.read(), filetype="pdf")
+    # Context manager: the document is closed even if a page fails to parse
+    with doc:
+        return "\n\n".join(page.get_text("text") for page in doc)
+
+
+def extract_text_in_subprocess(path: str, timeout: float) -> str:
+    """
+    Run extract_text_from_pdf(path) in its own short-lived process.
+
+    The child runs this file as a script, so it imports only PyMuPDF: no
+    app package, no entry script (main.py -> create_app()), no inherited
+    DB connections. A parse that hangs past `timeout` seconds is killed
+    (raises TimeoutError), and one that crashes the interpreter (MuPDF
+    segfault, OOM kill) only takes its own process down (raises
+    RuntimeError), so neither can wedge later uploads. Parser exceptions
+    re-raise as RuntimeError with the original message.
     """
-    pdf_bytes.seek(0)
-    doc = fitz.open(stream=pdf_bytes.read(), filetype="pdf")
-    texts = []
-    for page in doc:
-        texts.append(page.get_text("text"))
-    doc.close()
-    return "\n\n".join(texts)
+    # Text comes back through a file, not stdout: PyMuPDF prints its own
+    # warnings to stdout.
+    fd, out_path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        try:
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), path, out_path],
+                capture_output=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            # subprocess.run() has already killed the child
+            raise TimeoutError(f"PDF extraction exceeded {timeout}s") from None
+
+        if proc.returncode != 0:
+            lines = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+            detail = lines[-1] if lines else f"exit status {proc.returncode}"
+            raise RuntimeError(detail)
+
+        with open(out_path, encoding="utf-8") as f:
+            return f.read()
+    finally:
+        os.remove(out_path)
+
+
+if __name__ == "__main__":
+    # Child side of extract_text_in_subprocess(): argv = [pdf_path, out_path]
+    text = extract_text_from_pdf(sys.argv[1])
+    with open(sys.argv[2], "w", encoding="utf-8") as f:
+        f.write(text)
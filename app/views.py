@@ -1,9 +1,11 @@
 # app/views.py
 
-from datetime import date, datetime, timedelta
-from io import BytesIO
-from collections import Counter, defaultdict
-import json
+from datetime import date, timedelta
+import hashlib
+import os
+import tempfile
+from collections import namedtuple
+from functools import lru_cache
 
 from flask import (
     Blueprint,
@@ -15,13 +17,26 @@ from flask import (
     session,
     send_file,
     current_app,
+    g,
+    jsonify,
+    make_response,
 )
 from flask_login import login_required, current_user
-
-from . import db
-from .models import User, Subscription, Flashcard, Visit, Review
-from .ai import generate_flashcards_from_text  # direct AI call
-from .pdf_utils import extract_text_from_pdf
+from sqlalchemy import BigInteger, case, cast, func
+from sqlalchemy.orm import load_only
+import orjson
+
+from . import db, cache, visit_buffer
+from .models import User, Review, DailyMetric
+from .pdf_utils import extract_text_in_subprocess
+from .card_store import store_cards, load_cards
+from .jobs import (
+    enqueue_generation,
+    expire_if_overdue,
+    get_job,
+    mark_delivered,
+    reserve_daily_cards,
+)
 from .deck_export import (
     create_apkg_from_cards,
     create_csv_from_cards,
@@ -44,6 +59,11 @@ PLAN_LIMITS = {
 
 ADMIN_LIMIT = 3_000_000  # effectively unlimited for your admin account
 
+# Users shown per page in the admin panel table (?per_page= is clamped
+# to ADMIN_USERS_MAX_PER_PAGE)
+ADMIN_USERS_PER_PAGE = 50
+ADMIN_USERS_MAX_PER_PAGE = 200
+
 # ============================================================
 # OpenAI cost assumptions
 # (GPT-4o-mini-style pricing; adjust if you change models)
@@ -68,15 +88,30 @@ PLAN_PRICES = {
 EXTENSION_PLANS = {"premium", "professional"}
 
 
+# Precomputed plan-string -> plan-key lookup for the common spellings, so
+# hot helpers avoid allocating a new lower-cased string per call.
+_NORMALIZED_PLAN = {
+    **{p: p for p in PLAN_LIMITS},
+    **{p.capitalize(): p for p in PLAN_LIMITS},
+    None: "free",
+    "": "free",
+}
+
+
 # ============================================================
 # Helper functions
 # ============================================================
 
+def normalize_plan(plan: str | None) -> str:
+    """Same as (plan or "free").lower(), via a dict hit for known plans."""
+    return _NORMALIZED_PLAN.get(plan) or plan.lower()
+
+
 def get_daily_limit(user: User) -> int:
     """Return the per-day flashcard limit based on the user's plan."""
     if getattr(user, "is_admin", False):
         return ADMIN_LIMIT
-    plan = (user.plan or "free").lower()
+    plan = normalize_plan(user.plan)
     return PLAN_LIMITS.get(plan, PLAN_LIMITS["free"])
 
 
@@ -88,7 +123,15 @@ def ensure_daily_reset(user: User) -> None:
     - daily_cards_generated
     - daily_input_tokens
     - daily_output_tokens
+
+    Runs at most once per user per request (tracked on `g`), and only
+    commits when the counters were actually reset.
     """
+    done = g.setdefault("_daily_reset_done", set())
+    if user.id in done:
+        return
+    done.add(user.id)
+
     today = date.today()
     if not user.daily_reset_date or user.daily_reset_date < today:
         user.daily_reset_date = today
@@ -104,32 +147,50 @@ def ensure_daily_reset(user: User) -> None:
 def log_visit(path: str) -> None:
     """
     Record a page visit in the Visit table.
-    Safe to call even if something goes wrong.
+
+    Only remembers the path on `g`; `_queue_visit` hands the row to the
+    app's VisitBuffer once the response has been sent, and the buffer's
+    background thread bulk-inserts it. No DB work happens on the request
+    path.
     """
+    g._visit_path = path
+
+
+@views_bp.after_app_request
+def _queue_visit(response):
+    """Queue the visit recorded by log_visit() after the response closes."""
+    path = g.pop("_visit_path", None)
+    if not path:
+        return response
+
     try:
-        v = Visit(
-            path=path,
-            user_id=current_user.id
+        row = {
+            "path": path,
+            "user_id": current_user.id
             if getattr(current_user, "is_authenticated", False)
             else None,
-            ip_address=request.remote_addr or "",
-            user_agent=request.headers.get("User-Agent", "")[:512],
-        )
-        db.session.add(v)
-        db.session.commit()
+            "ip_address": request.remote_addr or "",
+            "user_agent": request.headers.get("User-Agent", ""),
+        }
+        response.call_on_close(lambda: visit_buffer.add(**row))
     except Exception:
-        db.session.rollback()
         current_app.logger.exception("Error logging visit for path %s", path)
 
+    return response
+
+
+@lru_cache(maxsize=1024)
+def _extension_access(is_admin: bool, plan) -> bool:
+    if is_admin:
+        return True
+    return normalize_plan(plan) in EXTENSION_PLANS
+
 
 def user_has_extension_access(user: User) -> bool:
     """
     Helper: return True if the user is allowed to access browser extensions.
     """
-    if getattr(user, "is_admin", False):
-        return True
-    plan = (user.plan or "free").lower()
-    return plan in EXTENSION_PLANS
+    return _extension_access(bool(getattr(user, "is_admin", False)), user.plan)
 
 
 # ============================================================
@@ -166,16 +227,17 @@ def dashboard():
     """
     Main generator UI:
     - Text + PDF input
-    - Calls AI generator directly (no Celery/Redis)
+    - Runs the AI generator as a background job (app/jobs.py) and polls
+      /job_status/<id> until the cards are ready
     - Enforces daily limits (NO MONTHLY LIMIT)
-    - Stores cards in session for export/download
+    - Stores cards in the app cache (card_store) for export/download
     - Can also be entered after extension_api generates cards
       (prefills from session["ext_text"] / session["ext_num_cards"])
     """
     log_visit("/dashboard")
     ensure_daily_reset(current_user)
 
-    cards = session.get("cards", [])
+    cards = load_cards()
 
     # Flags for extension-originated generation (optional)
     from_extension = session.pop("from_extension", False)
@@ -185,7 +247,45 @@ def dashboard():
     ext_text = session.pop("ext_text", None)
     ext_num_cards = session.pop("ext_num_cards", None)
 
+    # Plan-derived values don't change during the request; compute once.
+    daily_limit = get_daily_limit(current_user)
+    has_extension_access = user_has_extension_access(current_user)
+
+    def _render_dashboard(job_id=None):
+        used = current_user.daily_cards_generated or 0
+        return render_template(
+            "dashboard.html",
+            cards=cards,
+            plan=current_user.plan,
+            stripe_public_key=Config.STRIPE_PUBLIC_KEY,
+            daily_limit=daily_limit,
+            used=used,
+            remaining=max(0, daily_limit - used),
+            is_admin=current_user.is_admin,
+            from_extension=from_extension,
+            cards_created=cards_created,
+            ext_text=ext_text,
+            ext_num_cards=ext_num_cards,
+            has_extension_access=has_extension_access,
+            job_id=job_id,
+        )
+
     if request.method == "POST":
+        # ------------ Enforce DAILY limits only ---------------
+        # Checked before touching the PDF / AI so an exhausted quota
+        # never pays for extraction or generation it would throw away.
+        remaining = max(
+            0, daily_limit - (current_user.daily_cards_generated or 0)
+        )
+
+        if remaining <= 0:
+            flash(
+                "You’ve hit your daily card limit for your plan. "
+                "Upgrade your plan to generate more cards.",
+                "warning",
+            )
+            return _render_dashboard()
+
         # ------------ Input text ---------------
         raw_text = request.form.get("text_content", "").strip()
 
@@ -193,59 +293,36 @@ def dashboard():
         pdf_file = request.files.get("pdf_file")
         pdf_text = ""
         if pdf_file and pdf_file.filename:
+            # Stream the upload to disk (no full read() into memory) and
+            # hand the parser process a path instead of bytes. Closed
+            # before parsing: Windows can't reopen a file that is still open.
+            tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
             try:
-                pdf_bytes = pdf_file.read()
-                pdf_text = extract_text_from_pdf(BytesIO(pdf_bytes))
+                with tmp:
+                    pdf_file.save(tmp)
+                pdf_text = extract_text_in_subprocess(
+                    tmp.name, current_app.config["PDF_EXTRACT_TIMEOUT"]
+                )
             except Exception as e:
                 current_app.logger.exception("Error reading PDF")
-                flash(f"Error reading PDF: {e}", "danger")
-
-                # Recompute stats for re-render
-                daily_limit = get_daily_limit(current_user)
-                used = current_user.daily_cards_generated or 0
-                remaining = max(0, daily_limit - used)
-
-                return render_template(
-                    "dashboard.html",
-                    cards=cards,
-                    plan=current_user.plan,
-                    stripe_public_key=Config.STRIPE_PUBLIC_KEY,
-                    daily_limit=daily_limit,
-                    used=used,
-                    remaining=remaining,
-                    is_admin=current_user.is_admin,
-                    from_extension=from_extension,
-                    cards_created=cards_created,
-                    ext_text=ext_text,
-                    ext_num_cards=ext_num_cards,
-                    has_extension_access=user_has_extension_access(current_user),
-                )
+                if isinstance(e, TimeoutError):
+                    flash(
+                        "That PDF took too long to process. "
+                        "Try a smaller file or paste the text instead.",
+                        "danger",
+                    )
+                else:
+                    flash(f"Error reading PDF: {e}", "danger")
+                return _render_dashboard()
+            finally:
+                os.remove(tmp.name)
 
         # Combine text + PDF
         combined_text = "\n\n".join(x for x in [raw_text, pdf_text] if x).strip()
 
         if not combined_text:
             flash("Please enter text or upload a PDF.", "warning")
-
-            daily_limit = get_daily_limit(current_user)
-            used = current_user.daily_cards_generated or 0
-            remaining = max(0, daily_limit - used)
-
-            return render_template(
-                "dashboard.html",
-                cards=cards,
-                plan=current_user.plan,
-                stripe_public_key=Config.STRIPE_PUBLIC_KEY,
-                daily_limit=daily_limit,
-                used=used,
-                remaining=remaining,
-                is_admin=current_user.is_admin,
-                from_extension=from_extension,
-                cards_created=cards_created,
-                ext_text=ext_text,
-                ext_num_cards=ext_num_cards,
-                has_extension_access=user_has_extension_access(current_user),
-            )
+            return _render_dashboard()
 
         # ------------ Requested cards ---------------
         try:
@@ -255,153 +332,75 @@ def dashboard():
 
         requested_num = max(1, min(requested_num, 2000))
 
-        # ------------ Enforce DAILY limits only ---------------
-        daily_limit = get_daily_limit(current_user)
-        remaining = max(
-            0, daily_limit - (current_user.daily_cards_generated or 0)
-        )
+        num_cards = min(requested_num, remaining)
 
-        if remaining <= 0:
+        # Claim the cards now (atomically), so parallel POSTs can't each
+        # pass the check above before any job has been counted.
+        if not reserve_daily_cards(current_user.id, num_cards, daily_limit):
             flash(
                 "You’ve hit your daily card limit for your plan. "
                 "Upgrade your plan to generate more cards.",
                 "warning",
             )
+            return _render_dashboard()
 
-            return render_template(
-                "dashboard.html",
-                cards=cards,
-                plan=current_user.plan,
-                stripe_public_key=Config.STRIPE_PUBLIC_KEY,
-                daily_limit=daily_limit,
-                used=current_user.daily_cards_generated or 0,
-                remaining=0,
-                is_admin=current_user.is_admin,
-                from_extension=from_extension,
-                cards_created=cards_created,
-                ext_text=ext_text,
-                ext_num_cards=ext_num_cards,
-                has_extension_access=user_has_extension_access(current_user),
-            )
-
-        num_cards = min(requested_num, remaining)
-
-        # ------------ Direct AI call ---------------
+        # ------------ Background AI call ---------------
+        # The OpenAI round trip runs on the generation pool; the page
+        # polls /job_status/<id> and reloads once the cards are ready.
         try:
-            new_cards = generate_flashcards_from_text(
-                combined_text,
-                num_cards=num_cards,
+            job_id = enqueue_generation(current_user.id, combined_text, num_cards)
+        except Exception:
+            current_app.logger.exception("Error queueing flashcard generation")
+            flash(
+                "Flashcard generation couldn't be started. Please try again.",
+                "danger",
             )
+            return _render_dashboard()
+        return _render_dashboard(job_id=job_id)
 
-            if not new_cards:
-                flash(
-                    "No flashcards were produced. "
-                    "Try using more detailed input.",
-                    "warning",
-                )
-                daily_limit = get_daily_limit(current_user)
-                used = current_user.daily_cards_generated or 0
-                remaining = max(0, daily_limit - used)
-
-                return render_template(
-                    "dashboard.html",
-                    cards=cards,
-                    plan=current_user.plan,
-                    stripe_public_key=Config.STRIPE_PUBLIC_KEY,
-                    daily_limit=daily_limit,
-                    used=used,
-                    remaining=remaining,
-                    is_admin=current_user.is_admin,
-                    from_extension=from_extension,
-                    cards_created=cards_created,
-                    ext_text=ext_text,
-                    ext_num_cards=ext_num_cards,
-                    has_extension_access=user_has_extension_access(current_user),
-                )
-
-            used = len(new_cards)
-
-            # Track usage (cards)
-            # DAILY limit enforcement only; monthly is just analytics count
-            current_user.daily_cards_generated = (
-                current_user.daily_cards_generated or 0
-            ) + used
-
-            # Monthly usage counter (for analytics ONLY, not a limit)
-            if current_user.cards_generated_this_month is None:
-                current_user.cards_generated_this_month = 0
-            current_user.cards_generated_this_month += used
-
-            try:
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-
-            # Persist cards for analytics (Flashcard table)
-            try:
-                for c in new_cards:
-                    # c should be a dict, but be defensive
-                    if isinstance(c, dict):
-                        front = str(c.get("front", "")).strip()
-                        back = str(c.get("back", "")).strip()
-                    elif isinstance(c, (list, tuple)) and len(c) >= 2:
-                        front = str(c[0]).strip()
-                        back = str(c[1]).strip()
-                    else:
-                        continue
-
-                    if not front or not back:
-                        continue
-
-                    fc = Flashcard(
-                        user_id=current_user.id,
-                        front=front,
-                        back=back,
-                        source_type="dashboard",
-                    )
-                    db.session.add(fc)
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-                current_app.logger.exception("Error saving flashcards to DB")
-
-            session["cards"] = new_cards
-            cards = new_cards
+    # ----------------- Stats for GET / fallback --------------------
+    return _render_dashboard()
 
-            flash(f"Generated {used} flashcards.", "success")
 
-        except Exception as e:
-            current_app.logger.exception("Error during card generation")
-            flash(f"Error generating flashcards: {e}", "danger")
+@views_bp.route("/job_status/<job_id>")
+@login_required
+def job_status(job_id: str):
+    """
+    Polled by dashboard.html while a generation job runs.
 
-    # ----------------- Stats for GET / fallback --------------------
-    ensure_daily_reset(current_user)
-    daily_limit = get_daily_limit(current_user)
-    used = current_user.daily_cards_generated or 0
-    remaining = max(0, daily_limit - used)
+    When the job has finished, its cards are stored for display/export
+    and the result (or the job's error) is flashed, so the dashboard
+    reload shows them. Overdue jobs are failed here (expire_if_overdue).
+    """
+    job = get_job(job_id)
+    if not job or job.get("user_id") != current_user.id:
+        return jsonify({"status": "failed", "error": "Unknown job"}), 404
+
+    job = expire_if_overdue(job_id, job)
+    status = job["status"]
+    # Deliver the result once, even if the page polls again
+    if status == "finished" and mark_delivered(job_id, job):
+        new_cards = job.get("cards") or []
+        if new_cards:
+            store_cards(new_cards)
+            flash(f"Generated {len(new_cards)} flashcards.", "success")
+        else:
+            flash(
+                "No flashcards were produced. "
+                "Try using more detailed input.",
+                "warning",
+            )
+    elif status == "failed" and mark_delivered(job_id, job):
+        flash(f"Error generating flashcards: {job.get('error')}", "danger")
 
-    return render_template(
-        "dashboard.html",
-        cards=cards,
-        plan=current_user.plan,
-        daily_limit=daily_limit,
-        used=used,
-        remaining=remaining,
-        is_admin=current_user.is_admin,
-        stripe_public_key=Config.STRIPE_PUBLIC_KEY,
-        from_extension=from_extension,
-        cards_created=cards_created,
-        ext_text=ext_text,
-        ext_num_cards=ext_num_cards,
-        has_extension_access=user_has_extension_access(current_user),
-    )
+    return jsonify({"status": status})
 
 
 @views_bp.route("/download/<fmt>")
 @login_required
 def download(fmt: str):
     """Download flashcards in APKG / CSV / JSON."""
-    cards = session.get("cards", [])
+    cards = load_cards()
     if not cards:
         flash("No cards to download.", "warning")
         return redirect(url_for("views.dashboard"))
@@ -412,6 +411,7 @@ def download(fmt: str):
             mimetype="application/octet-stream",
             as_attachment=True,
             download_name="cardifyai_deck.apkg",
+            max_age=0,
         )
 
     if fmt == "csv":
@@ -420,6 +420,7 @@ def download(fmt: str):
             mimetype="text/csv",
             as_attachment=True,
             download_name="cardifyai_deck.csv",
+            max_age=0,
         )
 
     if fmt == "json":
@@ -428,6 +429,7 @@ def download(fmt: str):
             mimetype="application/json",
             as_attachment=True,
             download_name="cardifyai_deck.json",
+            max_age=0,
         )
 
     flash("Unknown export format.", "danger")
@@ -606,111 +608,203 @@ def reviews():
 # Admin dashboard (cost + revenue + users, NO monthly limit)
 # ============================================================
 
-@views_bp.route("/admin", methods=["GET"])
-@login_required
-def admin_dashboard():
+def _sum_int(column):
     """
-    Admin-only panel showing:
-    - All users, their plans, and DAILY usage details
-    - Cards generated this month (analytics only)
-    - Aggregated token usage + estimated cost
-    - Estimated monthly revenue by plan
+    COALESCE(SUM(column), 0) as an integer. Postgres returns SUM(bigint)
+    as numeric (Decimal in Python), which can't be multiplied by the float
+    token rates.
     """
-    log_visit("/admin")
+    return cast(func.coalesce(func.sum(column), 0), BigInteger)
 
-    if not current_user.is_admin:
-        flash("Admin access only.", "danger")
-        return redirect(url_for("views.dashboard"))
 
-    users = User.query.order_by(User.created_at.desc()).all()
-    plan_counts = Counter((u.plan or "free").lower() for u in users)
+# SQL twin of normalize_plan(): same as (plan or "free").lower()
+_PLAN_KEY = func.lower(func.coalesce(func.nullif(User.plan, ""), "free"))
 
-    # Token usage aggregates
-    total_daily_input = 0
-    total_daily_output = 0
-    total_monthly_input = 0
-    total_monthly_output = 0
 
-    # Revenue / cost aggregates
-    total_estimated_revenue = 0.0
-    total_estimated_cost = 0.0
-    total_monthly_cards = 0  # analytics only
-
-    user_rows = []
+@cache.memoize(timeout=300)
+def _admin_aggregates(users_version: str) -> dict:
+    """
+    Plan/token/revenue aggregates for the admin panel.
 
-    for u in users:
-        plan = (u.plan or "free").lower()
-        daily_limit = get_daily_limit(u)
-        daily_used = u.daily_cards_generated or 0
-        daily_remaining = max(0, daily_limit - daily_used)
+    Memoized per `users_version` (latest users.updated_at): any change to
+    a user row yields a new key, so reloads reuse the cached numbers until
+    something actually changes. The paginated user table is built per
+    request.
+    """
+    # Aggregates are computed in SQL; only the rendered table needs rows
+    (
+        total_daily_input,
+        total_daily_output,
+        total_monthly_input,
+        total_monthly_output,
+        total_monthly_cards,  # analytics only
+    ) = db.session.query(
+        _sum_int(User.daily_input_tokens),
+        _sum_int(User.daily_output_tokens),
+        _sum_int(User.monthly_input_tokens),
+        _sum_int(User.monthly_output_tokens),
+        _sum_int(User.cards_generated_this_month),
+    ).one()
+
+    # Estimated *cost* based on monthly tokens
+    total_estimated_cost = (total_monthly_input * INPUT_TOKEN_RATE) + (
+        total_monthly_output * OUTPUT_TOKEN_RATE
+    )
 
-        # Monthly cards = how many cards they generated this month
-        monthly_cards = u.cards_generated_this_month or 0
-        total_monthly_cards += monthly_cards
+    plan_counts = {}
+    admin_count = 0
+    total_estimated_revenue = 0.0
+    # One GROUP BY over (plan, is_admin): at most #plans x 2 rows
+    for plan, is_admin, count in (
+        db.session.query(_PLAN_KEY, User.is_admin, func.count())
+        .group_by(_PLAN_KEY, User.is_admin)
+        .all()
+    ):
+        plan_counts[plan] = plan_counts.get(plan, 0) + count
 
-        d_in = u.daily_input_tokens or 0
-        d_out = u.daily_output_tokens or 0
-        m_in = u.monthly_input_tokens or 0
-        m_out = u.monthly_output_tokens or 0
+        # Estimated *revenue* = plan price x users on that plan.
+        # Do NOT count admins as revenue, even if they're on a paid plan.
+        if is_admin:
+            admin_count += count
+        else:
+            total_estimated_revenue += PLAN_PRICES.get(plan, 0.0) * count
 
-        total_daily_input += d_in
-        total_daily_output += d_out
-        total_monthly_input += m_in
-        total_monthly_output += m_out
+    # Net margin
+    net_estimated_profit = total_estimated_revenue - total_estimated_cost
 
-        # Estimated *cost* per user based on monthly tokens
-        estimated_cost = (m_in * INPUT_TOKEN_RATE) + (m_out * OUTPUT_TOKEN_RATE)
+    return {
+        "plan_counts": plan_counts,
+        "admin_count": admin_count,
+        "total_monthly_cards": total_monthly_cards,
+        "total_daily_input_tokens": total_daily_input,
+        "total_daily_output_tokens": total_daily_output,
+        "total_monthly_input_tokens": total_monthly_input,
+        "total_monthly_output_tokens": total_monthly_output,
+        "total_estimated_cost": total_estimated_cost,
+        "total_estimated_revenue": total_estimated_revenue,
+        "net_estimated_profit": net_estimated_profit,
+    }
+
+
+# Per-user estimated *cost* based on monthly tokens, computed by the
+# database alongside each row of the admin users page.
+_ESTIMATED_COST = (
+    func.coalesce(User.monthly_input_tokens, 0) * INPUT_TOKEN_RATE
+    + func.coalesce(User.monthly_output_tokens, 0) * OUTPUT_TOKEN_RATE
+).label("estimated_cost")
+
+# Per-user estimated *revenue* from the plan price; admins count as 0
+# even on a paid plan.
+_ESTIMATED_REVENUE = case(
+    (User.is_admin.is_(True), 0.0),
+    *((_PLAN_KEY == plan, price) for plan, price in PLAN_PRICES.items()),
+    else_=0.0,
+).label("estimated_revenue")
+
+
+# One admin table row. Token columns are read from `user` in the template.
+UserRow = namedtuple(
+    "UserRow",
+    "user plan daily_limit daily_used daily_remaining monthly_cards "
+    "estimated_cost estimated_revenue",
+)
 
-        # Estimated *revenue* per user based on plan
-        plan_price = PLAN_PRICES.get(plan, 0.0)
 
-        # Do NOT count admins as revenue, even if they're on a paid plan
-        if u.is_admin:
-            plan_price = 0.0
+def _admin_user_rows(rows) -> list:
+    """
+    Build the per-user table rows for one page of the admin panel.
 
-        estimated_revenue = plan_price
-        total_estimated_cost += estimated_cost
-        total_estimated_revenue += estimated_revenue
+    `rows` are (User, estimated_cost, estimated_revenue) tuples from a
+    query that adds the _ESTIMATED_COST and _ESTIMATED_REVENUE columns.
+    """
+    user_rows = []
+    # Bound once: the loop below runs per user on the page
+    _get_limit = PLAN_LIMITS.get
+    _free_limit = PLAN_LIMITS["free"]
+
+    for u, estimated_cost, estimated_revenue in rows:
+        plan = normalize_plan(u.plan)
+        # Same result as get_daily_limit(u), without re-normalizing the plan
+        daily_limit = ADMIN_LIMIT if u.is_admin else _get_limit(plan, _free_limit)
+        daily_used = u.daily_cards_generated or 0
 
         user_rows.append(
-            {
-                "user": u,
-                "plan": plan,
-                "daily_limit": daily_limit,
-                "daily_used": daily_used,
-                "daily_remaining": daily_remaining,
-                "monthly_cards": monthly_cards,  # analytics only
-                "daily_input_tokens": d_in,
-                "daily_output_tokens": d_out,
-                "monthly_input_tokens": m_in,
-                "monthly_output_tokens": m_out,
-                "estimated_cost": estimated_cost,
-                "estimated_revenue": estimated_revenue,
-            }
+            UserRow(
+                user=u,
+                plan=plan,
+                daily_limit=daily_limit,
+                daily_used=daily_used,
+                daily_remaining=max(0, daily_limit - daily_used),
+                # Cards generated this month (analytics only)
+                monthly_cards=u.cards_generated_this_month or 0,
+                estimated_cost=estimated_cost,
+                estimated_revenue=estimated_revenue,
+            )
         )
 
-    # Net margin
-    net_estimated_profit = total_estimated_revenue - total_estimated_cost
+    return user_rows
+
+
+@views_bp.route("/admin", methods=["GET"])
+@login_required
+def admin_dashboard():
+    """
+    Admin-only panel showing:
+    - All users (paginated), their plans, and DAILY usage details
+    - Cards generated this month (analytics only)
+    - Aggregated token usage + estimated cost
+    - Estimated monthly revenue by plan
+    """
+    log_visit("/admin")
+
+    if not current_user.is_admin:
+        flash("Admin access only.", "danger")
+        return redirect(url_for("views.dashboard"))
+
+    # Cheap (indexed) cache key for the aggregates below
+    users_version = db.session.query(func.max(User.updated_at)).scalar()
+
+    per_page = request.args.get("per_page", ADMIN_USERS_PER_PAGE, type=int)
+    per_page = max(1, min(per_page, ADMIN_USERS_MAX_PER_PAGE))
+
+    # Only the current page of users is hydrated (and only the columns the
+    # table renders); totals come from SQL
+    pagination = (
+        User.query.options(
+            load_only(
+                User.id,
+                User.email,
+                User.plan,
+                User.is_admin,
+                User.created_at,
+                User.stripe_customer_id,
+                User.stripe_price_id,
+                User.daily_cards_generated,
+                User.cards_generated_this_month,
+                User.daily_input_tokens,
+                User.daily_output_tokens,
+                User.monthly_input_tokens,
+                User.monthly_output_tokens,
+            )
+        )
+        .add_columns(_ESTIMATED_COST, _ESTIMATED_REVENUE)
+        .order_by(User.created_at.desc())
+        .paginate(
+            page=request.args.get("page", 1, type=int),
+            per_page=per_page,
+            error_out=False,
+        )
+    )
 
     return render_template(
         "admin.html",
-        # user/plan stats
-        user_rows=user_rows,
-        plan_counts=plan_counts,
+        user_rows=_admin_user_rows(pagination.items),
+        pagination=pagination,
+        total_users=pagination.total,
         plan_limits=PLAN_LIMITS,
-        total_users=len(users),
-        total_monthly_cards=total_monthly_cards,
-        # token usage aggregate
-        total_daily_input_tokens=total_daily_input,
-        total_daily_output_tokens=total_daily_output,
-        total_monthly_input_tokens=total_monthly_input,
-        total_monthly_output_tokens=total_monthly_output,
-        # cost & revenue
-        total_estimated_cost=total_estimated_cost,
-        total_estimated_revenue=total_estimated_revenue,
-        net_estimated_profit=net_estimated_profit,
         input_token_rate=INPUT_TOKEN_RATE,
         output_token_rate=OUTPUT_TOKEN_RATE,
+        **_admin_aggregates(str(users_version)),
     )
 
 
@@ -718,11 +812,94 @@ def admin_dashboard():
 # Admin Analytics (charts, visits, subs, cards)
 # ============================================================
 
+@lru_cache(maxsize=2)
+def _labels_for(ordinal: int) -> tuple:
+    """
+    ISO date labels for the 30 days ending on date.fromordinal(ordinal),
+    built once per day.
+    """
+    start_date = date.fromordinal(ordinal - 29)
+    return tuple(
+        (start_date + timedelta(days=i)).isoformat() for i in range(30)
+    )
+
+
+def _daily_metric_counts(start_date: date) -> dict:
+    """
+    {(kind, "YYYY-MM-DD"): count} from the DailyMetric rollup since
+    start_date: at most 30 rows per kind, however large the event tables.
+    """
+    rows = (
+        db.session.query(DailyMetric.kind, DailyMetric.day, DailyMetric.count)
+        .filter(DailyMetric.day >= start_date)
+        .all()
+    )
+    return {(kind, day.isoformat()): n for kind, day, n in rows}
+
+
+@cache.memoize(timeout=60)
+def _analytics_payload(day: str) -> dict:
+    """
+    Build the 30-day Chart.js data + monthly token totals ending on `day`
+    (ISO date). The charts get a single JSON string, `chart_payload_json`:
+    {"labels": [...], "visits": [...], "subs": [...], "cards": [...]};
+    the KPI cards get the 30-day totals of those series.
+
+    Memoized per day for a short TTL: the numbers barely move between
+    admin refreshes, and keying on the date makes the window roll over
+    cleanly at midnight.
+    """
+    today = date.fromisoformat(day)
+    start_date = today - timedelta(days=29)
+
+    # Continuous 30-day window of ISO labels
+    labels = _labels_for(today.toordinal())
+
+    # Per-day counts come from the rollup table, not the raw event tables
+    counts = _daily_metric_counts(start_date)
+    visits_series = [counts.get(("visits", d), 0) for d in labels]
+    subs_series = [counts.get(("subs", d), 0) for d in labels]
+    cards_series = [counts.get(("cards", d), 0) for d in labels]
+
+    # Aggregate token usage + cost (monthly)
+    total_monthly_input, total_monthly_output = db.session.query(
+        _sum_int(User.monthly_input_tokens),
+        _sum_int(User.monthly_output_tokens),
+    ).one()
+    total_monthly_cost = (total_monthly_input * INPUT_TOKEN_RATE) + (
+        total_monthly_output * OUTPUT_TOKEN_RATE
+    )
+
+    # All chart data as ONE pre-serialized JSON blob; it is cached with
+    # the rest of the payload, so a cache hit does no serialization at all
+    chart_payload_json = orjson.dumps(
+        {
+            "labels": labels,
+            "visits": visits_series,
+            "subs": subs_series,
+            "cards": cards_series,
+        }
+    ).decode()
+
+    return {
+        "chart_payload_json": chart_payload_json,
+        "total_visits_30d": sum(visits_series),
+        "total_subs_30d": sum(subs_series),
+        "total_cards_30d": sum(cards_series),
+        "total_monthly_input_tokens": total_monthly_input,
+        "total_monthly_output_tokens": total_monthly_output,
+        "total_monthly_cost": total_monthly_cost,
+        "start_date": start_date,
+        "end_date": today,
+    }
+
+
 @views_bp.route("/admin/analytics", methods=["GET"])
 @login_required
 def admin_analytics():
     """
     Analytics panel for admins:
+    - Users, active subscribers, estimated revenue vs cost
     - Website visits per day (last 30 days)
     - New subscriptions per day (last 30 days)
     - Flashcards created per day (last 30 days)
@@ -734,86 +911,57 @@ def admin_analytics():
         flash("Admin access only.", "danger")
         return redirect(url_for("views.dashboard"))
 
-    today = date.today()
-    start_date = today - timedelta(days=29)
-    start_dt = datetime.combine(start_date, datetime.min.time())
-
-    # -------------------------
-    # Visits per day
-    # -------------------------
-    visits = (
-        Visit.query.filter(Visit.created_at >= start_dt)
-        .order_by(Visit.created_at.asc())
-        .all()
-    )
-    visits_by_day = defaultdict(int)
-    for v in visits:
-        d = v.created_at.date().isoformat()
-        visits_by_day[d] += 1
-
-    # -------------------------
-    # New subscriptions per day
-    # -------------------------
-    subs = (
-        Subscription.query.filter(Subscription.created_at >= start_dt)
-        .order_by(Subscription.created_at.asc())
-        .all()
-    )
-    subs_by_day = defaultdict(int)
-    for s in subs:
-        if s.created_at:
-            d = s.created_at.date().isoformat()
-            subs_by_day[d] += 1
-
-    # -------------------------
-    # Flashcards created per day
-    # -------------------------
-    flashcards = (
-        Flashcard.query.filter(Flashcard.created_at >= start_dt)
-        .order_by(Flashcard.created_at.asc())
-        .all()
-    )
-    cards_by_day = defaultdict(int)
-    for c in flashcards:
-        if c.created_at:
-            d = c.created_at.date().isoformat()
-            cards_by_day[d] += 1
-
-    # Normalize labels to a continuous 30-day window
-    labels = [
-        (start_date + timedelta(days=i)).isoformat()
-        for i in range(30)
-    ]
-
-    visits_series = [visits_by_day.get(d, 0) for d in labels]
-    subs_series = [subs_by_day.get(d, 0) for d in labels]
-    cards_series = [cards_by_day.get(d, 0) for d in labels]
-
-    # Aggregate token usage + cost (monthly)
-    users = User.query.all()
-    total_monthly_input = sum((u.monthly_input_tokens or 0) for u in users)
-    total_monthly_output = sum((u.monthly_output_tokens or 0) for u in users)
-    total_monthly_cost = (total_monthly_input * INPUT_TOKEN_RATE) + (
-        total_monthly_output * OUTPUT_TOKEN_RATE
-    )
-
-    # JSON for Chart.js
-    labels_json = json.dumps(labels)
-    visits_json = json.dumps(visits_series)
-    subs_json = json.dumps(subs_series)
-    cards_json = json.dumps(cards_series)
+    payload = _analytics_payload(date.today().isoformat())
+
+    # User / subscriber / revenue KPIs: the same memoized aggregates as
+    # the admin panel, keyed on the latest users.updated_at
+    users_version = db.session.query(func.max(User.updated_at)).scalar()
+    aggregates = _admin_aggregates(str(users_version))
+    plan_counts = aggregates["plan_counts"]
+    kpis = {
+        "total_users": sum(plan_counts.values()),
+        "total_active_subs": sum(
+            n for plan, n in plan_counts.items() if PLAN_PRICES.get(plan)
+        ),
+        "total_estimated_revenue": aggregates["total_estimated_revenue"],
+        "total_estimated_cost": aggregates["total_estimated_cost"],
+        "est_profit": aggregates["net_estimated_profit"],
+    }
+
+    # ETag over everything the page shows: an unchanged payload answers a
+    # revalidating browser with an empty 304 and skips the template.
+    etag = hashlib.md5(
+        "|".join(
+            [
+                *(
+                    str(payload[k])
+                    for k in (
+                        "chart_payload_json",
+                        "total_monthly_input_tokens",
+                        "total_monthly_output_tokens",
+                        "end_date",
+                    )
+                ),
+                str(users_version),
+            ]
+        ).encode()
+    ).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(
+            render_template(
+                "admin_analytics.html",
+                input_token_rate=INPUT_TOKEN_RATE,
+                output_token_rate=OUTPUT_TOKEN_RATE,
+                **payload,
+                **kpis,
+            )
+        )
 
-    return render_template(
-        "admin_analytics.html",
-        labels_json=labels_json,
-        visits_json=visits_json,
-        subs_json=subs_json,
-        cards_json=cards_json,
-        total_monthly_input_tokens=total_monthly_input,
-        total_monthly_output_tokens=total_monthly_output,
-        total_monthly_cost=total_monthly_cost,
-        input_token_rate=INPUT_TOKEN_RATE,
-        output_token_rate=OUTPUT_TOKEN_RATE,
-        start_date=start_date,
-        end_date=today,
-    )
+    response.set_etag(etag)
+    # Admin-only page: browsers may reuse it for a minute, proxies never
+    response.cache_control.private = True
+    response.cache_control.max_age = 60
+    return response
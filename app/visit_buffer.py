@@ -0,0 +1,106 @@
+# app/visit_buffer.py
+
+import atexit
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class VisitBuffer:
+    """
+    Process-local buffer for Visit rows.
+
+    Request handlers only append a dict to an in-memory deque; a daemon
+    thread flushes the queue every `interval` seconds with a single bulk
+    INSERT (plus the per-day "visits" rollup) + commit, so page views never
+    wait on a DB write.
+
+    Each Gunicorn worker owns its own buffer and flusher thread. Pending
+    rows are also flushed at interpreter exit.
+    """
+
+    def __init__(self, app=None, interval: float = 2.0):
+        self.app = None
+        self.interval = interval
+        self._queue = deque()
+        self._flush_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app) -> None:
+        self.app = app
+        self.interval = app.config.get("VISIT_FLUSH_INTERVAL", self.interval)
+        app.extensions["visit_buffer"] = self
+        atexit.register(self.flush)
+
+    # Column widths from the Visit model. One oversized value would fail the
+    # whole batch INSERT, so clip here instead of per-row at write time.
+    _MAX_LENGTHS = {"path": 255, "ip_address": 64, "user_agent": 512}
+
+    def add(self, **row) -> None:
+        """Queue one Visit row (keyword args = Visit columns)."""
+        for key, max_len in self._MAX_LENGTHS.items():
+            value = row.get(key)
+            if value and len(value) > max_len:
+                row[key] = value[:max_len]
+        row.setdefault("created_at", datetime.utcnow())
+        self._queue.append(row)  # deque.append is thread-safe
+        self._ensure_thread()
+
+    def flush(self) -> int:
+        """Write all queued visits in one batch. Returns the number written."""
+        if self.app is None:
+            return 0
+
+        with self._flush_lock:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.popleft())
+                except IndexError:
+                    break
+
+            if not batch:
+                return 0
+
+            from . import db
+            from .models import Visit
+            from .metrics import record_metric_times
+
+            with self.app.app_context():
+                try:
+                    db.session.bulk_insert_mappings(Visit, batch)
+                    record_metric_times(
+                        "visits", (row["created_at"] for row in batch)
+                    )
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception(
+                        "Error flushing %d buffered visits", len(batch)
+                    )
+                    return 0
+
+            return len(batch)
+
+    def _ensure_thread(self) -> None:
+        # Started lazily on the first visit so CLI commands / cron jobs that
+        # build the app never spawn it, and re-started in forked workers.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="visit-buffer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
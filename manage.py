@@ -17,8 +17,31 @@ def db_init():
     click.echo("Database initialized.")
 
 
-# Register CLI command
+@click.command("backfill_metrics")
+@click.option(
+    "--days",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only rebuild the last N days (default: all history).",
+)
+@with_appcontext
+def backfill_metrics(days):
+    """Rebuild the daily_metrics rollup from visits / subscriptions / flashcards."""
+    from datetime import datetime, timedelta
+
+    from app.metrics import backfill_daily_metrics
+
+    since = None
+    if days is not None:
+        today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+        since = today - timedelta(days=days - 1)
+    written = backfill_daily_metrics(since)
+    click.echo(f"Backfilled {written} daily metric rows.")
+
+
+# Register CLI commands
 app.cli.add_command(db_init)
+app.cli.add_command(backfill_metrics)
 
 if __name__ == "__main__":
     app.run(debug=True)